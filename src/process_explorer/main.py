@@ -2,45 +2,132 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, GLib, Gio
+from gi.repository import Gtk, Adw, GLib, Gio, GObject
 import psutil
+import os
+import pwd
 import signal
 import gettext
+import time
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from process_explorer.accessibility import AccessibilityManager
 
 _ = gettext.gettext
 APP_ID = "io.github.yeager.ProcessExplorer"
 
+# Per-process fields read on every refresh
+_PROC_ATTRS = ('pid', 'ppid', 'name', 'username', 'cpu_percent',
+               'memory_percent', 'memory_info', 'status')
+_PROC_ATTRS_NO_CPU = tuple(a for a in _PROC_ATTRS if a != 'cpu_percent')
+# Pulls the row fields out of an as_dict() result in one C-level call
+_proc_fields = itemgetter('name', 'username', 'cpu_percent', 'memory_percent',
+                          'status', 'ppid', 'memory_info')
+# CPU% over a shorter window than this is mostly noise
+_CPU_SAMPLE_INTERVAL = 1.0
+_GB = 1 << 30
+_STATS_FMT = "  CPU: {:.1f}% | RAM: {:.1f}% ({:.1f}/{:.1f} GB) | Disk: {:.1f}% | Processes: {}"
+# ProcessRow properties, in the order of the row tuples built by a scan
+_ROW_PROPS = ('pid', 'name', 'user', 'cpu', 'mem', 'rss', 'status', 'ppid', 'search-key')
+# Cell text for the columns that don't hold strings
+_CELL_FORMATS = {'pid': str, 'cpu': '{:.1f}'.format, 'mem': '{:.1f}'.format, 'rss': '{:.1f}'.format}
+
+# On Linux the process table is read straight from /proc
+_PROC_FAST = psutil.LINUX and os.path.isdir('/proc/self')
+if _PROC_FAST:
+    _CLK_TCK = os.sysconf('SC_CLK_TCK')
+    _PAGESIZE = os.sysconf('SC_PAGE_SIZE')
+# /proc/<pid>/stat state letters, named the way psutil names them
+_PROC_STATUSES = {
+    b'R': 'running', b'S': 'sleeping', b'D': 'disk-sleep', b'T': 'stopped',
+    b't': 'tracing-stop', b'Z': 'zombie', b'X': 'dead', b'x': 'dead',
+    b'K': 'wake-kill', b'W': 'waking', b'P': 'parked', b'I': 'idle',
+}
+
+
+
+_WLC_PATH = None
 
 
 def _wlc_settings_path():
-    import os
-    xdg = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
-    d = os.path.join(xdg, "process-explorer")
-    os.makedirs(d, exist_ok=True)
-    return os.path.join(d, "welcome.json")
-
-def _load_wlc_settings():
-    import os, json
+    # The welcome-shown flag is just the existence of this file
+    global _WLC_PATH
+    if _WLC_PATH is None:
+        xdg = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+        _WLC_PATH = os.path.join(xdg, "process-explorer", "welcome_shown")
+    return _WLC_PATH
+
+def _welcome_shown():
+    return os.path.exists(_wlc_settings_path())
+
+def _mark_welcome_shown():
     p = _wlc_settings_path()
-    if os.path.exists(p):
-        with open(p) as f:
-            return json.load(f)
-    return {"welcome_shown": False}
+    os.makedirs(os.path.dirname(p), exist_ok=True)
+    Path(p).touch()
+
+class ProcessRow(GObject.Object):
+    """One process in the list models; its properties back the columns."""
+
+    pid = GObject.Property(type=int)
+    name = GObject.Property(type=str)
+    user = GObject.Property(type=str)
+    cpu = GObject.Property(type=float)
+    mem = GObject.Property(type=float)
+    rss = GObject.Property(type=float)
+    status = GObject.Property(type=str)
+    ppid = GObject.Property(type=int)
+    search_key = GObject.Property(type=str)  # lowercased "pid\nname\nuser"
+
+    def __init__(self, row):
+        super().__init__()
+        for prop, value in zip(_ROW_PROPS, row):
+            self.set_property(prop, value)
+
+    def update(self, row, old):
+        """Write the properties that differ between *row* and *old*."""
+        for prop, value, old_value in zip(_ROW_PROPS, row, old):
+            if value != old_value:
+                self.set_property(prop, value)
 
-def _save_wlc_settings(s):
-    import json
-    with open(_wlc_settings_path(), "w") as f:
-        json.dump(s, f, indent=2)
 
 class ProcessExplorerWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
         super().__init__(**kwargs, title=_("Process Explorer"), default_width=1100, default_height=700)
         self._sort_col = 3  # CPU
         self._sort_asc = False
-        self._search_text = ""
+        self._search_text = ""  # stripped and lowercased
+        self._search_timeout_id = 0
+        self._refilter_pending = False
         self._auto_refresh = True
+        self._proc_cache = {}  # pid -> (create time, psutil.Process, (name, ppid)), kept across refreshes
+        self._prev_ticks = {}  # pid -> (start time, utime + stime, cpu%, when sampled) from /proc
+        self._proc_cpu = {}  # pid -> last cpu% from psutil
+        self._prev_scan_ts = 0  # when psutil per-process CPU was last sampled
+        self._proc_idents = {}  # pid -> (start time, comm, full name)
+        self._uid_names = {}  # uid -> user name
+        self._total_mem = psutil.virtual_memory().total
+        # Only root rows and the children of expanded rows get items; the
+        # rest of the tree stays as plain scan rows until it is expanded
+        self._rows = {}  # pid -> row values from the last scan
+        self._children = {}  # parent pid (None for roots) -> child pids
+        self._row_items = {}  # pid -> ProcessRow
+        self._row_snapshot = {}  # pid -> row values last written to the item
+        self._row_parents = {}  # pid -> parent pid in the tree, None for roots
+        self._child_stores = {}  # expanded pid -> Gio.ListStore of its children
+        self._sys_mem = None
+        self._sys_disk = None
+        self._last_sys_stats_ts = 0
+        self._last_cpu_sample = 0.0
+        self._last_cpu_value = 0.0
+        # psutil scans run here so /proc reads never block the GTK main loop
+        self._scan_pool = ThreadPoolExecutor(max_workers=1)
+        self._scan_in_flight = False
+        self._scan_again = False
+        self._closed = False  # the pool is shut down; late scan results are dropped
+        # The first non-blocking cpu_percent() call only sets the baseline
+        psutil.cpu_percent(interval=None)
 
         header = Adw.HeaderBar()
         self.theme_btn = Gtk.Button(icon_name="weather-clear-night-symbolic", tooltip_text=_("Toggle theme"))
@@ -77,43 +164,57 @@ class ProcessExplorerWindow(Adw.ApplicationWindow):
         # System stats
         self.stats_label = Gtk.Label(label="", css_classes=["dim-label"], margin_start=12, margin_top=4, xalign=0)
 
-        # Tree view
-        # Columns: PID, Name, User, CPU%, MEM%, RSS(MB), Status, PPID
-        self.store = Gtk.TreeStore(int, str, str, float, float, float, str, int)
-        self.filter_model = self.store.filter_new()
-        self.filter_model.set_visible_func(self._filter_func)
-        self.sort_model = Gtk.TreeModelSort(model=self.filter_model)
-
-        self.tree = Gtk.TreeView(model=self.sort_model, headers_clickable=True, enable_search=False)
-        self.tree.get_selection().set_mode(Gtk.SelectionMode.MULTIPLE)
+        # Process list: the root processes live in root_store and every
+        # parent's children in its own store, expanded on demand by the
+        # TreeListModel. Search filters on the precomputed search key.
+        self.root_store = Gio.ListStore(item_type=ProcessRow)
+        self.tree_model = Gtk.TreeListModel.new(self.root_store, False, False, self._create_child_model)
+        row_item = Gtk.PropertyExpression.new(Gtk.TreeListRow, None, "item")
+        self.search_filter = Gtk.StringFilter.new(Gtk.PropertyExpression.new(ProcessRow, row_item, "search-key"))
+        self.search_filter.set_ignore_case(False)
+        self.search_filter.set_match_mode(Gtk.StringFilterMatchMode.SUBSTRING)
+        # The filter is only attached while there is something to search for
+        self.filter_model = Gtk.FilterListModel(model=self.tree_model)
+
+        self.column_view = Gtk.ColumnView()
+        # Cells use the same 9 pt monospace font the TreeView renderers had
+        self._cell_css = Gtk.CssProvider()
+        self._cell_css.load_from_string(".process-cell { font-family: monospace; font-size: 9pt; }")
+        Gtk.StyleContext.add_provider_for_display(
+            self.get_display(), self._cell_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        # Sort siblings by the clicked column while keeping the hierarchy
+        self.row_sorter = Gtk.TreeListRowSorter.new(self.column_view.get_sorter())
+        self.sort_model = Gtk.SortListModel(model=self.filter_model, sorter=self.row_sorter)
+        self.selection = Gtk.MultiSelection(model=self.sort_model)
+        self.column_view.set_model(self.selection)
 
         cols = [
-            (_("PID"), 0, 70),
-            (_("Name"), 1, 200),
-            (_("User"), 2, 100),
-            (_("CPU %"), 3, 80),
-            (_("MEM %"), 4, 80),
-            (_("RSS MB"), 5, 80),
-            (_("Status"), 6, 80),
+            (_("PID"), "pid", 70),
+            (_("Name"), "name", 200),
+            (_("User"), "user", 100),
+            (_("CPU %"), "cpu", 80),
+            (_("MEM %"), "mem", 80),
+            (_("RSS MB"), "rss", 80),
+            (_("Status"), "status", 80),
         ]
-        for title, idx, width in cols:
-            if isinstance(idx, int) and idx in (3, 4, 5):
-                renderer = Gtk.CellRendererText(xalign=1.0, font="monospace 9")
-            else:
-                renderer = Gtk.CellRendererText(font="monospace 9")
-            col = Gtk.TreeViewColumn(title, renderer, text=idx)
+        for title, prop, width in cols:
+            col = Gtk.ColumnViewColumn(title=title, factory=self._make_factory(prop))
             col.set_resizable(True)
             col.set_fixed_width(width)
-            col.set_sort_column_id(idx)
-            col.set_clickable(True)
-            if idx == 1:
+            expr = Gtk.PropertyExpression.new(ProcessRow, None, prop)
+            if prop in ("pid", "cpu", "mem", "rss"):
+                col.set_sorter(Gtk.NumericSorter.new(expr))
+            else:
+                col.set_sorter(Gtk.StringSorter.new(expr))
+            if prop == "name":
                 col.set_expand(True)
-            self.tree.append_column(col)
+            self.column_view.append_column(col)
 
         sw = Gtk.ScrolledWindow(vexpand=True, margin_start=12, margin_end=12, margin_top=4, margin_bottom=4)
-        sw.set_child(self.tree)
+        sw.set_child(self.column_view)
 
         self.statusbar = Gtk.Label(label="", xalign=0, css_classes=["dim-label"], margin_start=12, margin_bottom=4)
+        self._status_label_set = self.statusbar.set_label
 
         content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         content.append(header)
@@ -123,114 +224,485 @@ class ProcessExplorerWindow(Adw.ApplicationWindow):
         content.append(self.statusbar)
         self.set_content(content)
 
-        self._refresh()
+        # The first refresh happens on map, and again whenever the window
+        # comes back from being minimized or fully obscured
+        self.connect("map", self._on_map)
+        self.connect("notify::suspended", self._on_suspended_changed)
+        self.connect("close-request", self._on_close_request)
         self._timer_id = GLib.timeout_add_seconds(3, self._auto_refresh_cb)
-        GLib.timeout_add_seconds(1, self._update_status)
+        self._status_timer_id = 0  # the clock starts ticking on map
+        self._pending_refresh_id = 0  # refresh after sending a signal
 
     def _refresh(self):
-        # Remember selection
-        sel_pids = set()
-        selection = self.tree.get_selection()
-        model, paths = selection.get_selected_rows()
-        for path in paths:
-            iter_ = model.get_iter(path)
-            if iter_:
-                sel_pids.add(model.get_value(iter_, 0))
-
-        self.store.clear()
+        if self._closed:
+            return
+        # Requests made while a scan is running collapse into one rescan
+        if self._scan_in_flight:
+            self._scan_again = True
+            return
+        self._scan_in_flight = True
+        # System stats are only sampled while the stats bar is on screen
+        future = self._scan_pool.submit(self._scan_procs, self.stats_label.get_mapped())
+        future.add_done_callback(lambda f: GLib.idle_add(self._apply_refresh, f))
+
+    def _scan_procs(self, with_stats):
+        # Runs on the scan thread: no GTK calls in here
+        rows = self._scan_proc_fast() if _PROC_FAST else self._scan_psutil()
+        children = {}
+        for pid in sorted(rows):
+            ppid = rows[pid][7]
+            children.setdefault(ppid if ppid in rows else None, []).append(pid)
+        return rows, children, self._scan_sys_stats() if with_stats else None
+
+    def _scan_proc_fast(self):
+        # One open/read/close of /proc/<pid>/stat per process gives
+        # everything but the owner, which comes from /proc/<pid>/status;
+        # CPU% comes from tick deltas between scans, the same way psutil
+        # computes it
+        now = time.monotonic()
+        prev_ticks = self._prev_ticks
+        prev_idents = self._proc_idents
+        ticks = {}
+        idents = {}
+        mem_scale = 100 / self._total_mem
+        rows = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                fd = os.open(f'/proc/{entry}/stat', os.O_RDONLY)
+                try:
+                    data = os.read(fd, 4096)
+                finally:
+                    os.close(fd)
+            except OSError:
+                continue  # exited since listdir()
+            if not data:
+                continue
+            pid = int(entry)
+            # comm may itself contain spaces and parentheses
+            rparen = data.rindex(b')')
+            fields = data[rparen + 2:].split()
+            start = fields[19]
+            total = int(fields[11]) + int(fields[12])
+            prev = prev_ticks.get(pid)
+            if prev is None or prev[0] != start:
+                cpu = 0.0
+                ticks[pid] = (start, total, cpu, now)
+            elif now - prev[3] >= _CPU_SAMPLE_INTERVAL:
+                # Each baseline keeps its own timestamp: a process first
+                # seen between two samples is measured from when it was seen
+                cpu = round((total - prev[1]) / _CLK_TCK / (now - prev[3]) * 100, 1)
+                ticks[pid] = (start, total, cpu, now)
+            else:
+                # Rapid refreshes keep the last CPU% and tick baseline
+                # instead of dividing by a tiny interval
+                cpu = prev[2]
+                ticks[pid] = prev
+
+            user = self._read_proc_user(entry)
+            if user is None:
+                continue
+            comm = data[data.index(b'(') + 1:rparen].decode(errors='replace')
+            ident = prev_idents.get(pid)
+            if ident is None or ident[0] != start or ident[1] != comm:
+                ident = (start, comm, self._read_proc_name(entry, comm))
+            idents[pid] = ident
+            name = ident[2]
+
+            rss = int(fields[21]) * _PAGESIZE
+            rows[pid] = (
+                pid,
+                name,
+                user,
+                cpu,
+                rss * mem_scale,
+                # RSS in MB to one decimal (truncated): a shift, not floats
+                (rss * 10 >> 20) / 10,
+                _PROC_STATUSES.get(fields[0], '?'),
+                int(fields[1]),
+                f"{pid}\n{name.lower()}\n{user.lower()}",
+            )
+        self._prev_ticks = ticks
+        self._proc_idents = idents
+        return rows
+
+    def _read_proc_user(self, entry):
+        # Read on every scan, since a process may setuid() at any time;
+        # only the uid -> name lookup is cached
+        try:
+            with open(f'/proc/{entry}/status', 'rb') as f:
+                data = f.read()
+            uid = int(data[data.index(b'\nUid:') + 5:].split(None, 1)[0])
+        except (OSError, ValueError):
+            return None
+        user = self._uid_names.get(uid)
+        if user is None:
+            try:
+                user = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                user = str(uid)
+            self._uid_names[uid] = user
+        return user
+
+    def _read_proc_name(self, entry, comm):
+        # comm is cut at 15 characters; like psutil, take the full name
+        # from the command line when it extends comm
+        if len(comm) < 15:
+            return comm
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                argv0 = f.read().split(b'\0', 1)[0]
+        except OSError:
+            return comm
+        full = os.path.basename(argv0.decode(errors='replace'))
+        return full if full.startswith(comm) else comm
+
+    def _scan_psutil(self):
         procs = {}
-        for p in psutil.process_iter(['pid', 'ppid', 'name', 'username', 'cpu_percent', 'memory_percent', 'memory_info', 'status']):
+        cache = self._proc_cache
+        now = time.monotonic()
+        # cpu_percent() measures since its previous call; skip it within
+        # a second of the last sample and reuse the last values instead
+        sample = now - self._prev_scan_ts >= _CPU_SAMPLE_INTERVAL
+        if sample:
+            self._prev_scan_ts = now
+            attrs = _PROC_ATTRS
+        else:
+            attrs = _PROC_ATTRS_NO_CPU
+        proc_cpu = self._proc_cpu
+        for pid in psutil.pids():
             try:
-                info = p.info
-                procs[info['pid']] = info
+                entry = cache.get(pid)
+                p = None
+                if entry is not None:
+                    p = entry[1]
+                    # oneshot() lets all fields share a single /proc parse
+                    with p.oneshot():
+                        info = p.as_dict(attrs, ad_value=None)
+                    # A reused PID shows up as a new name or parent; only
+                    # then pay for a fresh Process to compare create times.
+                    # The new process also needs its own cpu_percent() baseline.
+                    if ((info['name'], info['ppid']) != entry[2]
+                            and psutil.Process(pid).create_time() != entry[0]):
+                        p = None
+                        proc_cpu.pop(pid, None)
+                if p is None:
+                    p = psutil.Process(pid)
+                    with p.oneshot():
+                        info = p.as_dict(attrs, ad_value=None)
+                ident = (info['name'], info['ppid'])
+                if entry is None or entry[1] is not p or entry[2] != ident:
+                    cache[pid] = (p.create_time(), p, ident)
+                procs[pid] = info
             except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-
-        # Build tree - just flat for simplicity with parent info
-        iters = {}
-        # Add root processes first (ppid=0 or ppid not in procs)
-        def add_proc(pid, parent_iter=None):
-            info = procs.get(pid)
-            if info is None:
-                return
-            rss = (info.get('memory_info') and info['memory_info'].rss or 0) / 1024 / 1024
-            it = self.store.append(parent_iter, [
-                info['pid'],
-                info.get('name', '?'),
-                info.get('username', '?') or '?',
-                info.get('cpu_percent', 0) or 0,
-                info.get('memory_percent', 0) or 0,
-                round(rss, 1),
-                info.get('status', '?'),
-                info.get('ppid', 0),
-            ])
-            iters[pid] = it
-            return it
-
-        children = {}
+                cache.pop(pid, None)
+                continue
+            if sample:
+                proc_cpu[pid] = info['cpu_percent']
+            else:
+                info['cpu_percent'] = proc_cpu.get(pid)
+        for pid in cache.keys() - procs.keys():
+            del cache[pid]
+            proc_cpu.pop(pid, None)
+
+        # Build every row tuple here, off the main loop, so applying the
+        # scan does no per-field dict lookups
+        rows = {}
         for pid, info in procs.items():
-            ppid = info.get('ppid', 0)
-            children.setdefault(ppid, []).append(pid)
-
-        def add_tree(pid, parent_iter=None):
-            it = add_proc(pid, parent_iter)
-            for child_pid in children.get(pid, []):
-                add_tree(child_pid, it)
-
-        roots = [pid for pid, info in procs.items() if info.get('ppid', 0) not in procs]
-        for pid in sorted(roots):
-            add_tree(pid)
-
-        # Update system stats
-        cpu = psutil.cpu_percent()
-        mem = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        self.stats_label.set_label(
-            f"  CPU: {cpu:.1f}% | RAM: {mem.percent:.1f}% ({mem.used/1024/1024/1024:.1f}/{mem.total/1024/1024/1024:.1f} GB) | "
-            f"Disk: {disk.percent:.1f}% | Processes: {len(procs)}"
-        )
-
-    def _filter_func(self, model, iter_, _data=None):
-        if not self._search_text:
-            return True
-        name = (model.get_value(iter_, 1) or "").lower()
-        user = (model.get_value(iter_, 2) or "").lower()
-        pid = str(model.get_value(iter_, 0))
-        s = self._search_text.lower()
-        return s in name or s in user or s in pid
+            name, user, cpu, mem, status, ppid, mi = _proc_fields(info)
+            # Fields we may not read come back as None
+            name = name or '?'
+            user = user or '?'
+            rows[pid] = (
+                pid,
+                name,
+                user,
+                cpu or 0,
+                mem or 0,
+                # RSS in MB to one decimal (truncated): a shift, not floats
+                ((mi.rss * 10 >> 20) if mi else 0) / 10,
+                status or '?',
+                ppid or 0,
+                f"{pid}\n{name.lower()}\n{user.lower()}",
+            )
+        return rows
+
+    def _scan_sys_stats(self):
+        now = time.monotonic()
+        if now - self._last_cpu_sample >= _CPU_SAMPLE_INTERVAL:
+            self._last_cpu_value = psutil.cpu_percent(interval=None)
+            self._last_cpu_sample = now
+        cpu = self._last_cpu_value
+        # Memory and disk usage move slowly, sample them at most every 5s
+        if self._sys_mem is None or now - self._last_sys_stats_ts > 5:
+            self._sys_mem = psutil.virtual_memory()
+            self._sys_disk = psutil.disk_usage('/')
+            self._last_sys_stats_ts = now
+        return cpu, self._sys_mem, self._sys_disk
+
+    def _apply_refresh(self, future):
+        if self._closed:
+            return False
+        self._scan_in_flight = False
+        if self._scan_again:
+            self._scan_again = False
+            self._refresh()
+        rows, children, stats = future.result()
+        old_children = self._children
+        self._rows = rows
+        self._children = children
+
+        # Update the models in place so selection and expanded rows survive:
+        # only gone/moved processes leave their list, only new ones are
+        # added and only changed properties are written. Collapsed branches
+        # have no items, so none of this touches them.
+        items = self._row_items
+        snapshot = self._row_snapshot
+        parents = self._row_parents
+        stores = self._child_stores
+
+        # Take gone and reparented processes out of their parent's list;
+        # reparented ones get a new item if their new list is shown
+        for pid, parent in list(parents.items()):
+            if pid not in parents:
+                continue  # dropped along with a removed branch
+            row = rows.get(pid)
+            if row is not None and (row[7] if row[7] in rows else None) == parent:
+                continue
+            store = self.root_store if parent is None else stores[parent]
+            found, pos = store.find(items[pid])
+            if found:
+                store.remove(pos)
+            self._forget_children(pid)
+            del items[pid], snapshot[pid], parents[pid]
+
+        resort = research = False
+        for pid, item in items.items():
+            row = rows[pid]
+            old = snapshot[pid]
+            if row != old:
+                item.update(row, old)
+                snapshot[pid] = row
+                resort = True
+                research = research or row[8] != old[8]
+
+        # One splice per list keeps it to a single items-changed each
+        added = set()
+        for parent, store in [(None, self.root_store), *stores.items()]:
+            new_pids = [pid for pid in children.get(parent, ()) if pid not in parents]
+            if new_pids:
+                store.splice(store.get_n_items(), 0,
+                             [self._materialize(pid, parent) for pid in new_pids])
+                added.update(new_pids)
+
+        # A row only asks whether it has children when it is created, so
+        # re-add rows that just gained their first child or lost their last
+        for pid in list(parents):
+            if (pid in parents and pid not in added
+                    and (pid in children) != (pid in old_children)):
+                self._forget_children(pid)
+                self._reset_row(pid)
+
+        # List models don't watch item properties; re-run sort and search
+        # when the values they depend on may have changed
+        if resort and self.column_view.get_sorter().get_primary_sort_column() is not None:
+            self.row_sorter.changed(Gtk.SorterChange.DIFFERENT)
+        if research and self._search_text:
+            self.search_filter.changed(Gtk.FilterChange.DIFFERENT)
+
+        if stats is not None:
+            cpu, mem, disk = stats
+            self.stats_label.set_label(_STATS_FMT.format(
+                cpu, mem.percent, mem.used / _GB, mem.total / _GB, disk.percent, len(rows)))
+        return False
+
+    def _on_close_request(self, _win):
+        self._closed = True
+        GLib.source_remove(self._timer_id)
+        if self._status_timer_id:
+            GLib.source_remove(self._status_timer_id)
+        if self._search_timeout_id:
+            GLib.source_remove(self._search_timeout_id)
+        if self._pending_refresh_id:
+            GLib.source_remove(self._pending_refresh_id)
+        self._scan_pool.shutdown(wait=False, cancel_futures=True)
+        return False
+
+    def _create_child_model(self, item):
+        # Also called just to probe whether the row is expandable, so hand
+        # out an empty list; it is filled once the row is actually expanded
+        if item.props.pid in self._children:
+            return Gio.ListStore(item_type=ProcessRow)
+        return None
+
+    def _materialize(self, pid, parent):
+        row = self._rows[pid]
+        item = self._row_items[pid] = ProcessRow(row)
+        self._row_snapshot[pid] = row
+        self._row_parents[pid] = parent
+        return item
+
+    def _forget_children(self, pid):
+        # The row collapsed or went away: its children's items are no
+        # longer shown, nor is anything expanded below them
+        store = self._child_stores.pop(pid, None)
+        if store is None:
+            return
+        for i in range(store.get_n_items()):
+            child = store.get_item(i).props.pid
+            self._forget_children(child)
+            del self._row_items[child], self._row_snapshot[child], self._row_parents[child]
+
+    def _on_row_expanded(self, row, _pspec):
+        item = row.get_item()
+        if item is None:
+            return  # the row itself is being removed
+        pid = item.props.pid
+        if not row.get_expanded():
+            self._forget_children(pid)
+        elif pid not in self._child_stores and pid in self._row_items:
+            store = self._child_stores[pid] = row.get_children()
+            store.splice(0, 0, [self._materialize(child, pid)
+                                for child in self._children.get(pid, ())])
+
+    def _reset_row(self, pid):
+        parent = self._row_parents[pid]
+        store = self.root_store if parent is None else self._child_stores[parent]
+        item = self._row_items[pid]
+        found, pos = store.find(item)
+        if found:
+            store.splice(pos, 1, [item])
+
+    def _make_factory(self, prop):
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_cell_setup, prop)
+        factory.connect("bind", self._on_cell_bind, prop)
+        factory.connect("unbind", self._on_cell_unbind, prop)
+        return factory
+
+    def _on_cell_setup(self, _factory, list_item, prop):
+        # Gtk.Inscription doesn't size itself to its text, so rows never
+        # get measured per content and all share a one-line height
+        numeric = prop in ("cpu", "mem", "rss")
+        cell = Gtk.Inscription(xalign=1.0 if numeric else 0.0, css_classes=["process-cell"],
+                               text_overflow=Gtk.InscriptionOverflow.ELLIPSIZE_END)
+        if prop == "name":
+            list_item.set_child(Gtk.TreeExpander(child=cell))
+        else:
+            list_item.set_child(cell)
+
+    def _on_cell_bind(self, _factory, list_item, prop):
+        row = list_item.get_item()
+        child = list_item.get_child()
+        if prop == "name":
+            child.set_list_row(row)
+            child.expanded_handler = row.connect("notify::expanded", self._on_row_expanded)
+            cell = child.get_child()
+        else:
+            cell = child
+        fmt = _CELL_FORMATS.get(prop)
+        transform = (lambda _b, value: fmt(value)) if fmt else None
+        # The binding keeps the cell current while the item is updated
+        # in place; it is dropped again when the widget is recycled
+        cell.binding = row.get_item().bind_property(
+            prop, cell, "text", GObject.BindingFlags.SYNC_CREATE, transform)
+
+    def _on_cell_unbind(self, _factory, list_item, prop):
+        child = list_item.get_child()
+        if prop == "name":
+            child.get_list_row().disconnect(child.expanded_handler)
+            child.set_list_row(None)
+            child = child.get_child()
+        child.binding.unbind()
+        child.binding = None
+
+    def _on_search(self, _entry):
+        # Collapse a burst of keystrokes into a single refilter
+        if self._search_timeout_id:
+            GLib.source_remove(self._search_timeout_id)
+        self._search_timeout_id = GLib.timeout_add(120, self._apply_search)
+
+    def _apply_search(self):
+        self._search_timeout_id = 0
+        text = self.search_entry.get_text().strip().lower()
+        if text != self._search_text:
+            self._search_text = text
+            if self.get_mapped():
+                self._set_search(text)
+            else:
+                self._refilter_pending = True
+        return False
 
-    def _on_search(self, entry):
-        self._search_text = entry.get_text()
-        self.filter_model.refilter()
+    def _set_search(self, text):
+        # An empty search detaches the filter so the model passes rows
+        # straight through instead of consulting a match-all filter
+        self.search_filter.set_search(text)
+        self.filter_model.set_filter(self.search_filter if text else None)
 
     def _kill_selected(self, _btn):
         self._signal_selected(signal.SIGKILL)
 
     def _signal_selected(self, sig):
-        selection = self.tree.get_selection()
-        model, paths = selection.get_selected_rows()
-        for path in paths:
-            iter_ = model.get_iter(path)
-            if iter_:
-                pid = model.get_value(iter_, 0)
-                try:
-                    psutil.Process(pid).send_signal(sig)
-                except (psutil.NoSuchProcess, psutil.AccessDenied, PermissionError):
-                    pass
-        GLib.timeout_add(500, self._refresh)
+        selected = self.selection.get_selection()
+        for i in range(selected.get_size()):
+            row = self.selection.get_item(selected.get_nth(i))
+            pid = row.get_item().props.pid
+            try:
+                psutil.Process(pid).send_signal(sig)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, PermissionError):
+                pass
+        # Signalling several times in a row only refreshes once, 500 ms
+        # after the last one
+        if self._pending_refresh_id:
+            GLib.source_remove(self._pending_refresh_id)
+        self._pending_refresh_id = GLib.timeout_add(500, self._on_pending_refresh)
+
+    def _on_pending_refresh(self):
+        self._pending_refresh_id = 0
+        self._refresh()
+        return False
 
     def _toggle_auto(self, btn):
         self._auto_refresh = btn.get_active()
 
-    def _auto_refresh_cb(self):
+    def _on_map(self, _win):
+        if self._refilter_pending:
+            self._refilter_pending = False
+            self._set_search(self._search_text)
+        self._refresh()
+        if not self._status_timer_id:
+            self._update_status()
+
+    def _is_shown(self):
+        return self.get_mapped() and not self.is_suspended()
+
+    def _on_suspended_changed(self, _win, _pspec):
+        if not self._is_shown():
+            return
         if self._auto_refresh:
             self._refresh()
+        if not self._status_timer_id:
+            self._update_status()
+
+    def _auto_refresh_cb(self):
+        # Don't enumerate processes for a window nobody can see
+        if self._auto_refresh and self._is_shown():
+            self._refresh()
         return True
 
     def _update_status(self):
+        self._status_timer_id = 0
+        # Stop ticking while hidden; map/unsuspend start the clock again
+        if not self._is_shown():
+            return False
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.statusbar.set_label(f"  {now}")
-        return True
+        self._status_label_set(f"  {now}")
+        # Wake up right after the next wall-clock second, not every 1s
+        # from whenever the timer happened to start
+        delay = 1000 - int(time.time() * 1000) % 1000
+        self._status_timer_id = GLib.timeout_add(delay, self._update_status)
+        return False
 
     def _toggle_theme(self, _btn):
         mgr = Adw.StyleManager.get_default()
@@ -266,27 +738,9 @@ class ProcessExplorerApp(Adw.Application):
         win = self.props.active_window or ProcessExplorerWindow(application=self)
         win.present()
         # Welcome dialog
-        self._wlc_settings = _load_wlc_settings()
-        if not self._wlc_settings.get("welcome_shown"):
+        if not _welcome_shown():
             self._show_welcome(self.props.active_window or self)
 
-
-    def do_startup(self):
-        Adw.Application.do_startup(self)
-        quit_action = Gio.SimpleAction.new("quit", None)
-        quit_action.connect("activate", lambda *_: self.quit())
-        self.add_action(quit_action)
-        self.set_accels_for_action("app.quit", ["<Control>q"])
-
-
-def main():
-    app = ProcessExplorerApp()
-    app.run()
-
-
-if __name__ == "__main__":
-    main()
-
     def _show_welcome(self, win):
         dialog = Adw.Dialog()
         dialog.set_title(_("Welcome"))
@@ -312,10 +766,24 @@ if __name__ == "__main__":
         dialog.present(win)
 
     def _on_welcome_close(self, btn, dialog):
-        self._wlc_settings["welcome_shown"] = True
-        _save_wlc_settings(self._wlc_settings)
+        _mark_welcome_shown()
         dialog.close()
 
+    def do_startup(self):
+        Adw.Application.do_startup(self)
+        quit_action = Gio.SimpleAction.new("quit", None)
+        quit_action.connect("activate", lambda *_: self.quit())
+        self.add_action(quit_action)
+        self.set_accels_for_action("app.quit", ["<Control>q"])
+
+
+def main():
+    app = ProcessExplorerApp()
+    app.run()
+
+
+if __name__ == "__main__":
+    main()
 
 
 # --- Session restore ---
@@ -0,0 +1,47 @@
+"""CPU% from the /proc fast path, checked against psutil."""
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+try:
+    from process_explorer import main
+except (ImportError, ValueError) as e:  # no PyGObject / GTK 4 / libadwaita
+    pytest.skip(f"process_explorer.main not importable: {e}", allow_module_level=True)
+
+pytestmark = pytest.mark.skipif(not main._PROC_FAST, reason="needs Linux /proc")
+
+
+class _Scanner:
+    """Just the state _scan_proc_fast reads, without a window."""
+    _scan_proc_fast = main.ProcessExplorerWindow._scan_proc_fast
+    _read_proc_user = main.ProcessExplorerWindow._read_proc_user
+    _read_proc_name = main.ProcessExplorerWindow._read_proc_name
+
+    def __init__(self):
+        self._prev_ticks = {}
+        self._proc_idents = {}
+        self._uid_names = {}
+        self._total_mem = psutil.virtual_memory().total
+
+
+def test_process_first_seen_between_samples():
+    scanner = _Scanner()
+    scanner._scan_proc_fast()
+    time.sleep(0.6)
+    busy = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+    try:
+        time.sleep(0.3)
+        # First seen less than a second after the last sample
+        assert scanner._scan_proc_fast()[busy.pid][3] == 0.0
+        ref = psutil.Process(busy.pid)
+        ref.cpu_percent(interval=None)
+        time.sleep(main._CPU_SAMPLE_INTERVAL + 0.05)
+        cpu = scanner._scan_proc_fast()[busy.pid][3]
+        expected = ref.cpu_percent(interval=None)
+    finally:
+        busy.kill()
+        busy.wait()
+    assert abs(cpu - expected) < 15, (cpu, expected)